@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
-from supabase import create_client, Client
+import numpy as np
+import httpx
+from supabase import create_client, Client, ClientOptions
 from datetime import date, timedelta
 from invoice_generator import generate_invoice_pdf
 
@@ -11,72 +13,120 @@ st.set_page_config(page_title="Consultant Tracker", layout="wide", page_icon="
 def init_connection():
     url = st.secrets["supabase"]["url"]
     key = st.secrets["supabase"]["key"]
-    return create_client(url, key)
+    # One long-lived HTTP/2 pool shared by every query, sized for the concurrent fetches below
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        timeout=10.0,
+        follow_redirects=True,
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
 
 supabase: Client = init_connection()
 
 # --- 2. DATA FETCHING FUNCTIONS ---
 
+PREVIEW_ROW_LIMIT = 2000  # max invoice preview rows pulled into the browser
+
+def to_dataframe(data):
+    """Flatten Supabase rows into a DataFrame with Arrow-backed text columns."""
+    df = pd.json_normalize(data, sep="_")
+    # Arrow types an all-null column as `null`, which can't be filled later - leave those as object
+    typed = df.columns[df.notna().any()]
+    # Numbers and flags stay NumPy: a missing value is NaN there, which compares False,
+    # where Arrow's pd.NA raises in `if value > 0`
+    df[typed] = df[typed].convert_dtypes(
+        dtype_backend="pyarrow", convert_integer=False, convert_floating=False, convert_boolean=False
+    )
+    return df
+
+def client_names(projects_df):
+    """Client name per project row, "Unknown" for projects without a client."""
+    # json_normalize leaves clients_name out entirely when no row has a client
+    if "clients_name" not in projects_df:
+        return pd.Series("Unknown", index=projects_df.index)
+    return projects_df["clients_name"].fillna("Unknown")
+
+@st.cache_data(ttl=60, show_spinner=False)
 def get_active_projects():
     """Fetch active projects with client names."""
-    response = supabase.table("projects").select("*, clients(name)").eq("active", True).execute()
-    return pd.DataFrame(response.data)
+    response = supabase.table("projects")\
+        .select("id, name, loa_start, loa_end, loa_budget_days, daily_rate, clients(name)")\
+        .eq("active", True)\
+        .execute()
+
+    # Flattening turns the nested client into clients_name in one pass
+    df = to_dataframe(response.data)
+    if not df.empty:
+        # clients(name) is a left join, so projects without a client are listed too
+        df["client_name"] = client_names(df)
+        # Dropdown label, built once per cache fill rather than on every rerun
+        df["label"] = df["client_name"] + " | " + df["name"]
+    return df
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_all_projects():
+    """Fetch all projects (including archived) for the Manage tab."""
+    response = supabase.table("projects")\
+        .select("id, name, active, loa_start, loa_end, loa_budget_days, daily_rate, clients(name)")\
+        .order("name")\
+        .execute()
+    return to_dataframe(response.data)
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_all_clients():
     """Fetch all clients for the Project Creation dropdown."""
-    response = supabase.table("clients").select("*").order("name").execute()
-    return pd.DataFrame(response.data)
+    response = supabase.table("clients").select("id, name").order("name").execute()
+    return to_dataframe(response.data)
 
-def get_time_usage():
-    """Calculate billed vs unbilled usage for the dashboard."""
-    response = supabase.table("time_entries").select("project_id, hours, billed").execute()
-    df = pd.DataFrame(response.data)
-    
-    # FIX: Strictly define types for empty dataframe to prevent FutureWarning
-    if df.empty:
-        return pd.DataFrame(columns=["project_id", "total_hours", "unbilled_hours"]).astype(
-            {"project_id": "object", "total_hours": float, "unbilled_hours": float}
-        )
-    
-    df["hours"] = pd.to_numeric(df["hours"])
-    total_usage = df.groupby("project_id")["hours"].sum().reset_index().rename(columns={"hours": "total_hours"})
-    
-    unbilled_df = df[df["billed"] == False]
-    unbilled_usage = unbilled_df.groupby("project_id")["hours"].sum().reset_index().rename(columns={"hours": "unbilled_hours"}) if not unbilled_df.empty else pd.DataFrame(columns=["project_id", "unbilled_hours"])
-    
-    usage = pd.merge(total_usage, unbilled_usage, on="project_id", how="left")
-    usage["unbilled_hours"] = usage["unbilled_hours"].fillna(0.0)
-    return usage
+@st.cache_data(ttl=60, show_spinner=False)
+def get_dashboard_projects():
+    """Active projects with client name and billed/unbilled hours for the dashboard."""
+    # One RPC does the projects/clients/usage join in Postgres (see supabase/migrations)
+    response = supabase.rpc("dashboard_projects").execute()
+    return to_dataframe(response.data)
 
+@st.cache_data(ttl=120, show_spinner=False)
 def fetch_pos_for_project(project_id):
     response = supabase.table("purchase_orders").select("id, po_number").eq("project_id", project_id).execute()
     return response.data
 
+def clear_time_entry_caches():
+    """Invalidate every cached read derived from time_entries."""
+    get_dashboard_projects.clear()
+    get_entries_by_date.clear()
+    get_revenue_projection.clear()
+    fetch_invoice_preview.clear()
+    get_invoice_totals.clear()
+    get_prior_billed_hours.clear()
+
 def submit_time_entry(project_id, po_id, date_worked, description, hours):
     data = {"project_id": project_id, "po_id": po_id, "date_worked": str(date_worked), "description": description.strip(), "hours": hours, "billed": False}
     try:
         supabase.table("time_entries").insert(data).execute()
         st.success(f"✅ Logged {hours} hours on {date_worked}")
-        st.cache_data.clear() 
+        clear_time_entry_caches()
     except Exception as e:
         st.error(f"Database Error: {e}")
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_entries_by_date(target_date):
     """Fetches entries for a specific date (Daily Snapshot)."""
     # Nested select to handle the Client -> Project -> Entry relationship
     response = supabase.table("time_entries")\
-        .select("*, projects(name, clients(name)), purchase_orders(po_number)")\
+        .select("description, hours, projects(name, clients(name)), purchase_orders(po_number)")\
         .eq("date_worked", str(target_date))\
         .execute()
     
-    df = pd.DataFrame(response.data)
+    df = to_dataframe(response.data)
     if not df.empty:
-        df["Project"] = df["projects"].apply(lambda x: x.get("name") if x else "")
-        df["Client"] = df["projects"].apply(lambda x: x.get("clients", {}).get("name") if x and x.get("clients") else "")
-        df["PO"] = df["purchase_orders"].apply(lambda x: x.get("po_number") if x else "N/A")
-        return df[["Client", "Project", "PO", "description", "hours"]]
+        # A join that is null on every row yields no column at all, hence the reindex
+        df = df.reindex(columns=["projects_clients_name", "projects_name", "purchase_orders_po_number", "description", "hours"])
+        df = df.rename(columns={"projects_clients_name": "Client", "projects_name": "Project", "purchase_orders_po_number": "PO"})
+        return df.fillna({"Client": "", "Project": "", "PO": "N/A"})
     return pd.DataFrame()
 
+@st.cache_data(ttl=300, show_spinner=False)
 def get_revenue_projection(start_date, end_date):
     """Fetches unbilled time + rates for forecasting."""
     response = supabase.table("time_entries")\
@@ -86,46 +136,73 @@ def get_revenue_projection(start_date, end_date):
         .lte("date_worked", str(end_date))\
         .execute()
     
-    data = []
-    for row in response.data:
-        proj = row.get("projects", {})
-        if proj:
-            p_name = proj.get("name", "Unknown")
-            p_rate = float(proj.get("daily_rate", 0))
-            hours = float(row.get("hours", 0))
-            hourly_rate = p_rate / 8.0
-            amount = hours * hourly_rate
-            data.append({
-                "Project": p_name,
-                "Date": row["date_worked"],
-                "Hours": hours,
-                "Rate": hourly_rate,
-                "Amount": amount
-            })
-    return pd.DataFrame(data)
-
+    df = to_dataframe(response.data)
+    if "projects_name" not in df:
+        return pd.DataFrame()
+
+    # Entries without a project are skipped; the math is whole-column
+    df = df.dropna(subset=["projects_name"])
+    hours = df["hours"].fillna(0).astype(float)
+    hourly_rate = df["projects_daily_rate"].fillna(0).astype(float) / 8.0
+    return pd.DataFrame({
+        "Project": df["projects_name"],
+        "Date": df["date_worked"],
+        "Hours": hours,
+        "Rate": hourly_rate,
+        "Amount": hours * hourly_rate
+    })
+
+@st.cache_data(ttl=30, show_spinner=False)
 def fetch_invoice_preview(project_id, start_date, end_date):
-    response = supabase.table("time_entries")\
-        .select("id, date_worked, description, hours, purchase_orders(po_number)")\
+    # time_entries_v already carries po_number as a flat column (see supabase/migrations)
+    response = supabase.table("time_entries_v")\
+        .select("id, date_worked, description, hours, po_number")\
         .eq("project_id", project_id)\
         .eq("billed", False)\
         .gte("date_worked", str(start_date))\
         .lte("date_worked", str(end_date))\
         .order("date_worked", desc=False)\
+        .limit(PREVIEW_ROW_LIMIT)\
         .execute()
-    return pd.DataFrame(response.data)
-
-def mark_entries_as_billed(entry_ids, invoice_ref):
+    return to_dataframe(response.data)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_invoice_totals(project_id, start_date, end_date):
+    """(entry count, total hours) of unbilled entries in range, aggregated in Postgres."""
+    response = supabase.rpc("invoice_range_totals", {
+        "p_project_id": project_id,
+        "p_start_date": str(start_date),
+        "p_end_date": str(end_date)
+    }).execute()
+    totals = response.data[0] if response.data else {}
+    return totals.get("entry_count") or 0, float(totals.get("total_hours") or 0)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_prior_billed_hours(project_id):
+    """Hours already invoiced on a project, summed in Postgres."""
+    response = supabase.rpc("project_billed_hours", {"pid": project_id}).execute()
+    return float(response.data or 0)
+
+def mark_entries_as_billed(project_id, invoice_ref, entry_ids):
+    # One UPDATE for exactly the previewed entries. The ids travel in the RPC's POST body,
+    # not the URL, and the function rolls back if any of them is already billed or missing.
     try:
-        supabase.table("time_entries")\
-            .update({"billed": True, "invoice_ref": invoice_ref})\
-            .in_("id", entry_ids)\
-            .execute()
+        supabase.rpc("finalize_invoice", {
+            "p_project_id": project_id,
+            "p_invoice_ref": invoice_ref,
+            "p_entry_ids": entry_ids
+        }).execute()
+        clear_time_entry_caches()
         return True
     except Exception as e:
         st.error(f"Error updating billing status: {e}")
         return False
 
+@st.cache_data(max_entries=20, show_spinner=False)
+def build_invoice_pdf(**invoice_fields):
+    """Render an invoice PDF, reusing the bytes when the inputs haven't changed."""
+    return generate_invoice_pdf(**invoice_fields)
+
 # --- MANAGERIAL FUNCTIONS ---
 def create_project(client_id, name, start, end, budget, rate):
     data = {
@@ -135,7 +212,9 @@ def create_project(client_id, name, start, end, budget, rate):
     try:
         supabase.table("projects").insert(data).execute()
         st.success(f"✅ Project '{name}' created successfully!")
-        st.cache_data.clear()
+        get_active_projects.clear()
+        get_all_projects.clear()
+        get_dashboard_projects.clear()
         return True
     except Exception as e:
         st.error(f"Error creating project: {e}")
@@ -145,7 +224,10 @@ def update_project(project_id, updates):
     try:
         supabase.table("projects").update(updates).eq("id", project_id).execute()
         st.success("✅ Project updated successfully!")
-        st.cache_data.clear()
+        # Names, rates and the active flag also feed the usage/snapshot/forecast reads
+        get_active_projects.clear()
+        get_all_projects.clear()
+        clear_time_entry_caches()
         return True
     except Exception as e:
         st.error(f"Error updating project: {e}")
@@ -155,7 +237,7 @@ def create_purchase_order(project_id, po_number):
     try:
         supabase.table("purchase_orders").insert({"project_id": project_id, "po_number": po_number}).execute()
         st.success(f"✅ PO '{po_number}' added successfully!")
-        st.cache_data.clear()
+        fetch_pos_for_project.clear()
         return True
     except Exception as e:
         st.error(f"Error adding PO: {e}")
@@ -164,14 +246,22 @@ def create_purchase_order(project_id, po_number):
 # --- 3. MAIN UI LAYOUT ---
 st.title("Consultant Time & Budget Tracker")
 
+# Shared by the Log Time, Dashboard and Invoice tabs - fetched once per rerun
+projects_df = get_active_projects()
+
+# "Client | Project" -> id map for the project dropdowns (column-wise, no iterrows)
+project_options = {}
+if not projects_df.empty:
+    project_options = dict(zip(projects_df["label"], projects_df["id"]))
+
+# on_change="rerun" makes the tabs track which one is open, so hidden tabs can skip work via `.open`
 tab_entry, tab_dashboard, tab_invoice, tab_finance, tab_manage = st.tabs([
     "📝 Log Time", "🚀 Dashboard", "📄 Invoices", "💰 Forecasting", "🛠️ Manage"
-])
+], key="main_tabs", on_change="rerun")
 
 # --- TAB 1: DATA ENTRY ---
 with tab_entry:
     st.header("Day Sheet")
-    projects_df = get_active_projects()
     
     # REVISION: Reactive Date Picker
     c1, c2 = st.columns([1, 2])
@@ -190,7 +280,6 @@ with tab_entry:
     st.write("---")
     
     if not projects_df.empty:
-        project_options = {f"{row['clients']['name']} | {row['name']}": row['id'] for index, row in projects_df.iterrows()}
         selected_project_label = st.selectbox("Select Project", options=list(project_options.keys()))
         selected_project_id = project_options[selected_project_label]
         
@@ -223,43 +312,42 @@ with tab_dashboard:
     view_mode = st.radio("Display Units:", ["Days", "Hours", "Both"], horizontal=True)
     st.write("---")
 
-    projects_df = get_active_projects()
-    usage_df = get_time_usage()
-    
-    if not projects_df.empty:
-        dashboard_data = pd.merge(projects_df, usage_df, left_on="id", right_on="project_id", how="left")
-        dashboard_data["total_hours"] = dashboard_data["total_hours"].fillna(0.0)
-        
+    dashboard_df = get_dashboard_projects()
+    if not dashboard_df.empty:
+        dashboard_data = dashboard_df
         dashboard_data["days_used"] = dashboard_data["total_hours"] / 8.0
         dashboard_data["budget_remaining_days"] = dashboard_data["loa_budget_days"] - dashboard_data["days_used"]
         dashboard_data["budget_remaining_hours"] = dashboard_data["budget_remaining_days"] * 8.0
         dashboard_data["budget_total_hours"] = dashboard_data["loa_budget_days"] * 8.0
-        
-        dashboard_data["client_name"] = dashboard_data["clients"].apply(lambda x: x.get("name", "Unknown") if isinstance(x, dict) else "Unknown")
-
-        for index, row in dashboard_data.iterrows():
-            st.subheader(f"{row['client_name']} | {row['name']}")
-            
-            if view_mode == "Days":
-                cap_label = f"{row['loa_budget_days']:.2f} Days"
-                used_label = f"{row['days_used']:.2f} Days"
-                rem_label = f"{row['budget_remaining_days']:.2f} Days"
-            elif view_mode == "Hours":
-                cap_label = f"{row['budget_total_hours']:.2f} Hours"
-                used_label = f"{row['total_hours']:.2f} Hours"
-                rem_label = f"{row['budget_remaining_hours']:.2f} Hours"
-            else: # Both
-                cap_label = f"{row['loa_budget_days']:.2f} D / {row['budget_total_hours']:.1f} H"
-                used_label = f"{row['days_used']:.2f} D / {row['total_hours']:.1f} H"
-                rem_label = f"{row['budget_remaining_days']:.2f} D / {row['budget_remaining_hours']:.1f} H"
+        # Clipped usage ratio for st.progress; zero-budget projects get 0.0 instead of inf/NaN
+        has_budget = dashboard_data["loa_budget_days"] > 0
+        dashboard_data["budget_pct"] = (dashboard_data["days_used"] / dashboard_data["loa_budget_days"]).where(has_budget, 0.0).clip(0.0, 1.0)
+
+        # Metric labels for the selected unit, built column-wise before the render loop
+        if view_mode == "Days":
+            dashboard_data["cap_label"] = dashboard_data["loa_budget_days"].map("{:.2f} Days".format)
+            dashboard_data["used_label"] = dashboard_data["days_used"].map("{:.2f} Days".format)
+            dashboard_data["rem_label"] = dashboard_data["budget_remaining_days"].map("{:.2f} Days".format)
+        elif view_mode == "Hours":
+            dashboard_data["cap_label"] = dashboard_data["budget_total_hours"].map("{:.2f} Hours".format)
+            dashboard_data["used_label"] = dashboard_data["total_hours"].map("{:.2f} Hours".format)
+            dashboard_data["rem_label"] = dashboard_data["budget_remaining_hours"].map("{:.2f} Hours".format)
+        else: # Both
+            dashboard_data["cap_label"] = dashboard_data["loa_budget_days"].map("{:.2f} D / ".format) + dashboard_data["budget_total_hours"].map("{:.1f} H".format)
+            dashboard_data["used_label"] = dashboard_data["days_used"].map("{:.2f} D / ".format) + dashboard_data["total_hours"].map("{:.1f} H".format)
+            dashboard_data["rem_label"] = dashboard_data["budget_remaining_days"].map("{:.2f} D / ".format) + dashboard_data["budget_remaining_hours"].map("{:.1f} H".format)
+
+        # itertuples yields plain namedtuples - no per-row Series like iterrows
+        for row in dashboard_data.itertuples(index=False):
+            st.subheader(f"{row.client_name} | {row.name}")
 
             c1, c2, c3 = st.columns(3)
-            c1.metric("Budget Cap", cap_label)
-            c2.metric("Days Used", used_label)
-            c3.metric("Remaining", rem_label)
+            c1.metric("Budget Cap", row.cap_label)
+            c2.metric("Days Used", row.used_label)
+            c3.metric("Remaining", row.rem_label)
             
-            if row['loa_budget_days'] > 0:
-                st.progress(max(0.0, min(1.0, row['days_used'] / row['loa_budget_days'])))
+            if row.loa_budget_days > 0:
+                st.progress(row.budget_pct)
             else:
                 st.warning("Budget is 0 days.")
             st.markdown("---")
@@ -271,19 +359,18 @@ with tab_invoice:
     st.header("Generate Invoice")
     col1, col2 = st.columns(2)
     
-    # 1. Fetch Projects & Handle Empty State safely
-    inv_projects_df = get_active_projects()
+    # 1. Handle Empty Project State safely
     inv_project_id = None
     
     with col1:
-        if inv_projects_df.empty:
+        if projects_df.empty:
             st.warning("No active projects found. Please create one in the 'Manage' tab.")
             inv_selected_label = None
         else:
-            inv_project_options = {f"{row['clients']['name']} | {row['name']}": row['id'] for index, row in inv_projects_df.iterrows()}
-            inv_selected_label = st.selectbox("Select Project for Invoice", options=list(inv_project_options.keys()))
+            project_by_id = projects_df.set_index("id", drop=False)
+            inv_selected_label = st.selectbox("Select Project for Invoice", options=list(project_options.keys()))
             if inv_selected_label:
-                inv_project_id = inv_project_options[inv_selected_label]
+                inv_project_id = project_options[inv_selected_label]
                 
         qb_invoice_num = st.text_input("QuickBooks Invoice #", placeholder="e.g. 1099")
 
@@ -293,36 +380,37 @@ with tab_invoice:
     # 2. Proceed only if we have a valid project ID
     if inv_project_id and isinstance(date_range, tuple) and len(date_range) == 2:
         start_date, end_date = date_range
-        preview_df = fetch_invoice_preview(inv_project_id, start_date, end_date)
+        # Cheap totals first - empty ranges never pull the row payload
+        entry_count, total_inv_hours = get_invoice_totals(inv_project_id, start_date, end_date)
+        preview_df = fetch_invoice_preview(inv_project_id, start_date, end_date) if entry_count else pd.DataFrame()
         
         if not preview_df.empty:
-            preview_df["PO"] = preview_df["purchase_orders"].apply(lambda x: x.get("po_number", "General") if isinstance(x, dict) else "General")
+            preview_df["PO"] = preview_df["po_number"].fillna("General")
             st.dataframe(preview_df[["date_worked", "description", "PO", "hours"]], use_container_width=True)
             
-            total_inv_hours = preview_df["hours"].sum()
-            
             # REVISION: Rounded to 2 decimal places
+            # total_inv_hours comes from Postgres, so it covers every entry even when the preview is capped
             st.metric("Total Invoice Days", f"{total_inv_hours / 8.0:.2f} Days")
+
+            # A capped preview would produce an incomplete invoice, so block the actions
+            preview_truncated = entry_count > PREVIEW_ROW_LIMIT
+            if preview_truncated:
+                st.warning(f"⚠️ Showing the first {PREVIEW_ROW_LIMIT:,} of {entry_count:,} unbilled entries. Narrow the date range to invoice them.")
             
             st.write("---")
-            if st.button("Generate Invoice PDF"):
+            if st.button("Generate Invoice PDF", disabled=preview_truncated):
                 if not qb_invoice_num:
                     st.error("Please enter a QuickBooks Invoice # first.")
                 else:
-                    proj_data = inv_projects_df[inv_projects_df['id'] == inv_project_id].iloc[0]
-                    
-                    history_response = supabase.table("time_entries") \
-                        .select("hours") \
-                        .eq("project_id", inv_project_id) \
-                        .eq("billed", True) \
-                        .execute()
+                    proj_data = project_by_id.loc[inv_project_id]
                     
-                    prior_hours = sum([item['hours'] for item in history_response.data])
+                    prior_hours = get_prior_billed_hours(inv_project_id)
                     prior_days = prior_hours / 8.0
                     
-                    line_items = preview_df.to_dict('records')
+                    # Column view, not to_dict('records') - no per-row dict allocation
+                    line_items = preview_df[["date_worked", "description", "PO", "hours"]]
                     
-                    pdf_bytes = generate_invoice_pdf(
+                    pdf_bytes = build_invoice_pdf(
                         project_name=inv_selected_label.split(" | ")[1], 
                         invoice_num=qb_invoice_num, 
                         start_date=start_date, 
@@ -346,14 +434,13 @@ with tab_invoice:
 
             st.write("---")
             st.warning("⚠️ Clicking below will remove these entries from future invoices.")
-            if st.button("Finalize & Mark as Billed"):
+            if st.button("Finalize & Mark as Billed", disabled=preview_truncated):
                 if not qb_invoice_num:
                     st.error("Please enter a QuickBooks Invoice # before finalizing.")
                 else:
-                    success = mark_entries_as_billed(preview_df["id"].tolist(), qb_invoice_num)
+                    success = mark_entries_as_billed(inv_project_id, qb_invoice_num, preview_df["id"].tolist())
                     if success:
                         st.success(f"Invoice {qb_invoice_num} finalized! entries locked.")
-                        st.cache_data.clear()
         else:
             st.info("No unbilled entries found for this range.")
 
@@ -398,118 +485,117 @@ with tab_finance:
 
 # --- TAB 5: MANAGE PROJECTS ---
 with tab_manage:
-    st.header("Project Administration")
-    
-    clients_df = get_all_clients()
-    # Fetch all projects (including archived) for editing
-    all_projects_response = supabase.table("projects").select("*, clients(name)").order("name").execute()
-    all_projects_df = pd.DataFrame(all_projects_response.data)
-
-    # UPDATED: Added "Manage POs" to the list
-    tab_create, tab_edit, tab_po = st.tabs(["New Project", "Edit / Archive", "Manage POs"])
-
-    # SUB-TAB: CREATE
-    with tab_create:
-        st.subheader("Create New Project")
-        if not clients_df.empty:
-            with st.form("create_project_form"):
-                client_map = {row['name']: row['id'] for i, row in clients_df.iterrows()}
-                c_name = st.selectbox("Client", options=list(client_map.keys()))
-                p_name = st.text_input("Project Name", placeholder="e.g. 25 FY Leadership Ops")
-                
-                c1, c2 = st.columns(2)
-                p_start = c1.date_input("LOA Start", value=date.today())
-                p_end = c2.date_input("LOA End", value=date.today() + timedelta(days=365))
-                
-                c3, c4 = st.columns(2)
-                p_budget = c3.number_input("Budget (Days)", min_value=0.0, step=0.5)
-                p_rate = c4.number_input("Daily Rate ($)", min_value=0.0, step=50.0)
+    # Admin data is only fetched while this tab is actually open
+    if tab_manage.open:
+        st.header("Project Administration")
+        
+        clients_df = get_all_clients()
+        all_projects_df = get_all_projects()
+
+        # UPDATED: Added "Manage POs" to the list
+        tab_create, tab_edit, tab_po = st.tabs(["New Project", "Edit / Archive", "Manage POs"])
+
+        # SUB-TAB: CREATE
+        with tab_create:
+            st.subheader("Create New Project")
+            if not clients_df.empty:
+                with st.form("create_project_form"):
+                    client_map = dict(zip(clients_df["name"], clients_df["id"]))
+                    c_name = st.selectbox("Client", options=list(client_map.keys()))
+                    p_name = st.text_input("Project Name", placeholder="e.g. 25 FY Leadership Ops")
+                    
+                    c1, c2 = st.columns(2)
+                    p_start = c1.date_input("LOA Start", value=date.today())
+                    p_end = c2.date_input("LOA End", value=date.today() + timedelta(days=365))
+                    
+                    c3, c4 = st.columns(2)
+                    p_budget = c3.number_input("Budget (Days)", min_value=0.0, step=0.5)
+                    p_rate = c4.number_input("Daily Rate ($)", min_value=0.0, step=50.0)
+                    
+                    if st.form_submit_button("Create Project"):
+                        if not p_name:
+                            st.error("Project Name is required.")
+                        else:
+                            create_project(client_map[c_name], p_name, p_start, p_end, p_budget, p_rate)
+            else:
+                st.warning("No clients found. Please add clients in Supabase first.")
+
+        # SUB-TAB: EDIT
+        with tab_edit:
+            st.subheader("Edit or Archive Project")
+            if not all_projects_df.empty:
+                # Dropdown to select project
+                all_projects_df["display_name"] = (
+                    np.where(all_projects_df["active"], "🟢 ", "🔴 ") + client_names(all_projects_df) + " | " + all_projects_df["name"]
+                )
+                # Indexed by label: one row Series for the selected project, not one per project
+                proj_by_label = all_projects_df.drop_duplicates("display_name", keep="last").set_index("display_name")
                 
-                if st.form_submit_button("Create Project"):
-                    if not p_name:
-                        st.error("Project Name is required.")
-                    else:
-                        create_project(client_map[c_name], p_name, p_start, p_end, p_budget, p_rate)
-        else:
-            st.warning("No clients found. Please add clients in Supabase first.")
-
-    # SUB-TAB: EDIT
-    with tab_edit:
-        st.subheader("Edit or Archive Project")
-        if not all_projects_df.empty:
-            # Dropdown to select project
-            all_projects_df["display_name"] = all_projects_df.apply(
-                lambda x: f"{'🔴' if not x['active'] else '🟢'} {x['clients']['name']} | {x['name']}", axis=1
-            )
-            proj_map = {row['display_name']: row for i, row in all_projects_df.iterrows()}
-            
-            selected_proj_label = st.selectbox("Select Project to Edit", options=list(proj_map.keys()))
-            proj_data = proj_map[selected_proj_label]
-            
-            # Edit Form
-            with st.form("edit_project_form"):
-                new_name = st.text_input("Project Name", value=proj_data['name'])
+                selected_proj_label = st.selectbox("Select Project to Edit", options=proj_by_label.index.tolist())
+                proj_data = proj_by_label.loc[selected_proj_label]
                 
-                c1, c2 = st.columns(2)
-                # Parse dates safely
-                d_start = date.fromisoformat(proj_data['loa_start'])
-                d_end = date.fromisoformat(proj_data['loa_end'])
+                # Edit Form
+                with st.form("edit_project_form"):
+                    new_name = st.text_input("Project Name", value=proj_data['name'])
+                    
+                    c1, c2 = st.columns(2)
+                    # Parse dates safely
+                    d_start = date.fromisoformat(proj_data['loa_start'])
+                    d_end = date.fromisoformat(proj_data['loa_end'])
+                    
+                    new_start = c1.date_input("LOA Start", value=d_start)
+                    new_end = c2.date_input("LOA End", value=d_end)
+                    
+                    c3, c4 = st.columns(2)
+                    new_budget = c3.number_input("Budget (Days)", value=float(proj_data['loa_budget_days']), step=0.5)
+                    new_rate = c4.number_input("Daily Rate ($)", value=float(proj_data['daily_rate']), step=50.0)
+                    
+                    # STATUS TOGGLE
+                    st.markdown("---")
+                    is_active = st.checkbox("Project is Active", value=proj_data['active'], help="Uncheck to Archive this project (Remove from menus)")
+                    
+                    if st.form_submit_button("Update Project"):
+                        updates = {
+                            "name": new_name,
+                            "loa_start": str(new_start),
+                            "loa_end": str(new_end),
+                            "loa_budget_days": new_budget,
+                            "daily_rate": new_rate,
+                            "active": is_active
+                        }
+                        update_project(proj_data['id'], updates)
+            else:
+                st.info("No projects found.")
+
+        # SUB-TAB: PURCHASE ORDERS (New!)
+        with tab_po:
+            st.subheader("Manage Purchase Orders (Sub-Projects)")
+            if not all_projects_df.empty:
+                # Re-use the display logic from Edit tab
+                all_projects_df["display_name"] = client_names(all_projects_df) + " | " + all_projects_df["name"]
+                po_proj_map = dict(zip(all_projects_df["display_name"], all_projects_df["id"]))
                 
-                new_start = c1.date_input("LOA Start", value=d_start)
-                new_end = c2.date_input("LOA End", value=d_end)
+                selected_po_proj_label = st.selectbox("Select Project", options=list(po_proj_map.keys()), key="po_proj_select")
+                selected_po_proj_id = po_proj_map[selected_po_proj_label]
                 
-                c3, c4 = st.columns(2)
-                new_budget = c3.number_input("Budget (Days)", value=float(proj_data['loa_budget_days']), step=0.5)
-                new_rate = c4.number_input("Daily Rate ($)", value=float(proj_data['daily_rate']), step=50.0)
+                # Show existing POs
+                current_pos = fetch_pos_for_project(selected_po_proj_id)
+                if current_pos:
+                    st.write("**Existing POs:**")
+                    for po in current_pos:
+                        st.text(f"• {po['po_number']}")
+                else:
+                    st.info("No POs assigned to this project yet.")
                 
-                # STATUS TOGGLE
-                st.markdown("---")
-                is_active = st.checkbox("Project is Active", value=proj_data['active'], help="Uncheck to Archive this project (Remove from menus)")
+                st.write("---")
                 
-                if st.form_submit_button("Update Project"):
-                    updates = {
-                        "name": new_name,
-                        "loa_start": str(new_start),
-                        "loa_end": str(new_end),
-                        "loa_budget_days": new_budget,
-                        "daily_rate": new_rate,
-                        "active": is_active
-                    }
-                    update_project(proj_data['id'], updates)
-        else:
-            st.info("No projects found.")
-
-    # SUB-TAB: PURCHASE ORDERS (New!)
-    with tab_po:
-        st.subheader("Manage Purchase Orders (Sub-Projects)")
-        if not all_projects_df.empty:
-            # Re-use the display logic from Edit tab
-            all_projects_df["display_name"] = all_projects_df.apply(
-                lambda x: f"{x['clients']['name']} | {x['name']}", axis=1
-            )
-            po_proj_map = {row['display_name']: row['id'] for i, row in all_projects_df.iterrows()}
-            
-            selected_po_proj_label = st.selectbox("Select Project", options=list(po_proj_map.keys()), key="po_proj_select")
-            selected_po_proj_id = po_proj_map[selected_po_proj_label]
-            
-            # Show existing POs
-            current_pos = fetch_pos_for_project(selected_po_proj_id)
-            if current_pos:
-                st.write("**Existing POs:**")
-                for po in current_pos:
-                    st.text(f"• {po['po_number']}")
+                # Add New PO Form
+                with st.form("add_po_form"):
+                    new_po_num = st.text_input("New PO Number / Name", placeholder="e.g. PO #123456 or 'Training Budget'")
+                    if st.form_submit_button("Add Purchase Order"):
+                        if new_po_num:
+                            create_purchase_order(selected_po_proj_id, new_po_num)
+                        else:
+                            st.error("Please enter a PO Number.")
             else:
-                st.info("No POs assigned to this project yet.")
-            
-            st.write("---")
-            
-            # Add New PO Form
-            with st.form("add_po_form"):
-                new_po_num = st.text_input("New PO Number / Name", placeholder="e.g. PO #123456 or 'Training Budget'")
-                if st.form_submit_button("Add Purchase Order"):
-                    if new_po_num:
-                        create_purchase_order(selected_po_proj_id, new_po_num)
-                    else:
-                        st.error("Please enter a PO Number.")
-        else:
-            st.info("Create a project first.")
\ No newline at end of file
+                st.info("Create a project first.")
\ No newline at end of file
@@ -1,31 +1,101 @@
-from fpdf import FPDF
+from fpdf import FPDF, XPos, YPos
+try:
+    from fpdf.image_parsing import preload_image
+except ImportError:  # fpdf2 internals moved: fall back to the plain per-document pdf.image() call
+    preload_image = None
 import pandas as pd
 import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Logo read once at import
+# Make sure 'logo.png' is in the same folder as this script
+_LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logo.png")
+_LOGO_BYTES = None
+if os.path.exists(_LOGO_PATH):
+    with open(_LOGO_PATH, "rb") as logo_file:
+        _LOGO_BYTES = logo_file.read()
+
+# Parsed logo as (fpdf2 image key, image info), filled by the first invoice. Decoding and
+# recompressing the PNG is the slowest step of a render, so later documents reuse it.
+# Sharing relies on fpdf2 internals (pinned in requirements.txt) and switches itself off
+# if they fail, leaving header() to parse the logo per document.
+_logo_cache = None
+_logo_sharing = preload_image is not None
+_logo_lock = threading.Lock()
+
+# Company header lines printed beside the logo: (font style, font size, line height, text)
+HEADER_ROWS = (
+    ('B', 15, 10, 'Canto Chao, Inc.'),
+    ('', 10, 5, 'Consultant Services'),
+)
+
+# Cell formatters, bound once instead of an f-string per cell
+_money = "${:,.2f}".format
+_hours = "{:.2f}".format
+_days = "{:.4f} Days".format
+
+# Table column layouts, (cell width, align), shared by each table's header and data rows
+LOA_COLUMNS = ((50, 'L'), (40, 'C'), (40, 'R'), (40, 'R'))
+LOA_HEADER = ("LOA Dates", "Total LOA Budget", "Daily Rate", "Hourly Rate")
+SUMMARY_COLUMNS = ((45, 'C'), (45, 'C'), (45, 'C'), (45, 'R'))
+SUMMARY_HEADER = ("Days Used (This Invoice)", "Total Days Remaining", "Total Hours (This Invoice)", "Total Amount Due")
+ACTIVITY_COLUMNS = ((25, 'L'), (75, 'L'), (30, 'L'), (25, 'R'), (30, 'R'))
+ACTIVITY_HEADER = ("Date", "Description", "Sub-Project (PO)", "Hours", "Amount")
+
+def _row(pdf, columns, texts, h=8):
+    """One bordered table row: each text in its column's width and alignment, then a line break."""
+    cell = pdf.cell
+    for (width, align), text in zip(columns, texts):
+        cell(width, h, text, border=1, align=align)
+    pdf.ln()
+
+def _register_logo(pdf):
+    """Put the parsed logo into pdf's image cache, decoding the PNG only once per process."""
+    global _logo_cache, _logo_sharing
+    try:
+        # Streamlit renders on one thread per session, so the one-time fill is serialized
+        with _logo_lock:
+            if _logo_cache is None:
+                key, _, info = preload_image(pdf.image_cache, _LOGO_BYTES)
+                # An ICC profile index points into per-document state, so such a logo is parsed every time
+                if info["iccp_i"] is None:
+                    _logo_cache = key, type(info)(info)
+                return
+            key, info = _logo_cache
+        # Own copy per document: fpdf2 writes per-document ids (i, usages, obj_id) into it
+        pdf.image_cache.images[key] = type(info)(info)
+    except Exception:
+        logger.warning("Sharing the parsed logo failed, parsing it per invoice instead", exc_info=True)
+        with _logo_lock:
+            _logo_cache = None
+            _logo_sharing = False
 
 class PDF(FPDF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if _LOGO_BYTES is not None and _logo_sharing:
+            _register_logo(self)
+
     def header(self):
         # Logo: Add the image to the top left
-        # Make sure 'logo.png' is in the same folder as this script
-        if os.path.exists("logo.png"):
-            self.image("logo.png", x=10, y=8, w=50)
+        if _LOGO_BYTES is not None:
+            self.image(_LOGO_BYTES, x=10, y=8, w=50)
         
-        # Font for Company Name
-        self.set_font('Arial', 'B', 15)
-        # Move to the right to align with logo
-        self.cell(55)
-        self.cell(0, 10, 'Canto Chao, Inc.', ln=True, align='L')
-        
-        # Font for Header Details
-        self.set_font('Arial', '', 10)
-        self.cell(55)
-        self.cell(0, 5, 'Consultant Services', ln=True, align='L')
+        # Company name + details, each moved right to align with the logo
+        for style, size, height, text in HEADER_ROWS:
+            self.set_font('Helvetica', style, size)
+            self.cell(55)
+            self.cell(0, height, text, new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
         
         # Line break to separate header from content
         self.ln(15)
 
     def footer(self):
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
+        self.set_font('Helvetica', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', align='C')
 
 def generate_invoice_pdf(project_name, invoice_num, start_date, end_date, 
@@ -37,12 +107,12 @@ def generate_invoice_pdf(project_name, invoice_num, start_date, end_date,
     pdf.set_auto_page_break(auto=True, margin=15)
 
     # --- INVOICE DETAILS & PROJECT INFO ---
-    pdf.set_font('Arial', 'B', 12)
-    pdf.cell(0, 10, f"INVOICE #: {invoice_num}", ln=True, align='R')
+    pdf.set_font('Helvetica', 'B', 12)
+    pdf.cell(0, 10, f"INVOICE #: {invoice_num}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='R')
     
-    pdf.set_font('Arial', '', 10)
-    pdf.cell(0, 5, f"Project: {project_name}", ln=True, align='L')
-    pdf.cell(0, 5, f"Billing Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}", ln=True, align='L')
+    pdf.set_font('Helvetica', '', 10)
+    pdf.cell(0, 5, f"Project: {project_name}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
+    pdf.cell(0, 5, f"Billing Period: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='L')
     pdf.ln(5)
 
     # --- MATH CALCULATIONS ---
@@ -54,79 +124,94 @@ def generate_invoice_pdf(project_name, invoice_num, start_date, end_date,
 
     # --- TABLE 1: LOA STATUS ---
     pdf.set_fill_color(200, 220, 255)
-    pdf.set_font('Arial', 'B', 10)
-    pdf.cell(0, 8, "LOA Status & Rates", ln=True, fill=True)
+    pdf.set_font('Helvetica', 'B', 10)
+    pdf.cell(0, 8, "LOA Status & Rates", new_x=XPos.LMARGIN, new_y=YPos.NEXT, fill=True)
     
-    pdf.set_font('Arial', '', 9)
+    pdf.set_font('Helvetica', '', 9)
     # Header row
-    pdf.cell(50, 8, "LOA Dates", border=1)
-    pdf.cell(40, 8, "Total LOA Budget", border=1, align='C')
-    pdf.cell(40, 8, "Daily Rate", border=1, align='R')
-    pdf.cell(40, 8, "Hourly Rate", border=1, align='R')
-    pdf.ln()
+    _row(pdf, LOA_COLUMNS, LOA_HEADER)
     # Data row
-    pdf.cell(50, 8, f"{loa_start} to {loa_end}", border=1)
-    pdf.cell(40, 8, f"{loa_budget:.2f} Days", border=1, align='C')
-    pdf.cell(40, 8, f"${daily_rate:,.2f}", border=1, align='R')
-    pdf.cell(40, 8, f"${hourly_rate:,.2f}", border=1, align='R')
-    pdf.ln(12)
+    _row(pdf, LOA_COLUMNS, (f"{loa_start} to {loa_end}", f"{loa_budget:.2f} Days", _money(daily_rate), _money(hourly_rate)))
+    pdf.ln(4)
 
     # --- TABLE 2: BUDGET SUMMARY ---
-    pdf.set_font('Arial', 'B', 10)
-    pdf.cell(0, 8, "Budget Summary for this Period", ln=True, fill=True)
+    pdf.set_font('Helvetica', 'B', 10)
+    pdf.cell(0, 8, "Budget Summary for this Period", new_x=XPos.LMARGIN, new_y=YPos.NEXT, fill=True)
     
-    pdf.set_font('Arial', '', 9)
+    pdf.set_font('Helvetica', '', 9)
     # Headers
-    pdf.cell(45, 8, "Days Used (This Invoice)", border=1, align='C')
-    pdf.cell(45, 8, "Total Days Remaining", border=1, align='C')
-    pdf.cell(45, 8, "Total Hours (This Invoice)", border=1, align='C')
-    pdf.cell(45, 8, "Total Amount Due", border=1, align='R')
-    pdf.ln()
+    _row(pdf, SUMMARY_COLUMNS, SUMMARY_HEADER)
     # Data
-    pdf.set_font('Arial', 'B', 10)
-    pdf.cell(45, 10, f"{current_days:.4f} Days", border=1, align='C')
-    pdf.cell(45, 10, f"{remaining_days:.4f} Days", border=1, align='C')
-    pdf.cell(45, 10, f"{current_hours:.2f} Hours", border=1, align='C')
-    pdf.cell(45, 10, f"${invoice_total_amount:,.2f}", border=1, align='R')
-    pdf.ln(15)
+    pdf.set_font('Helvetica', 'B', 10)
+    _row(pdf, SUMMARY_COLUMNS, (_days(current_days), _days(remaining_days), f"{current_hours:.2f} Hours", _money(invoice_total_amount)), h=10)
+    pdf.ln(5)
 
     # --- TABLE 3: DETAILED ACTIVITY GRID ---
-    pdf.set_font('Arial', 'B', 10)
-    pdf.cell(0, 8, "Detailed Activity Log", ln=True, fill=True)
+    pdf.set_font('Helvetica', 'B', 10)
+    pdf.cell(0, 8, "Detailed Activity Log", new_x=XPos.LMARGIN, new_y=YPos.NEXT, fill=True)
     
     # Headers
-    pdf.set_font('Arial', 'B', 9)
-    pdf.cell(25, 8, "Date", border=1)
-    pdf.cell(75, 8, "Description", border=1)
-    pdf.cell(30, 8, "Sub-Project (PO)", border=1)
-    pdf.cell(25, 8, "Hours", border=1, align='R')
-    pdf.cell(30, 8, "Amount", border=1, align='R')
-    pdf.ln()
+    pdf.set_font('Helvetica', 'B', 9)
+    _row(pdf, ACTIVITY_COLUMNS, ACTIVITY_HEADER)
     
-    # Rows
-    pdf.set_font('Arial', '', 8)
-    for item in line_items:
-        hours = float(item['hours'])
-        amount = hours * hourly_rate
-        po_name = item['PO'] if item['PO'] else "General"
-        
-        pdf.cell(25, 7, item['date_worked'], border=1)
-        
-        # Handle long descriptions
-        x = pdf.get_x()
-        y = pdf.get_y()
-        pdf.multi_cell(75, 7, item['description'], border=1, align='L')
-        pdf.set_xy(x + 75, y) # Reset position to right of description
-        
-        pdf.cell(30, 7, po_name, border=1)
-        pdf.cell(25, 7, f"{hours:.2f}", border=1, align='R')
-        pdf.cell(30, 7, f"${amount:,.2f}", border=1, align='R')
-        pdf.ln()
+    # Rows (line_items is a DataFrame, or a list of dicts, with date_worked, description, PO, hours)
+    if not isinstance(line_items, pd.DataFrame):
+        line_items = pd.DataFrame(line_items, columns=['date_worked', 'description', 'PO', 'hours'])
+    pdf.set_font('Helvetica', '', 8)
+    # Math, PO fallback and number formatting done column-wise; the loop only emits cells
+    line_hours = line_items['hours'].astype(float)
+    hours_text = map(_hours, line_hours.tolist())
+    amount_text = map(_money, (line_hours * hourly_rate).tolist())
+    po_names = line_items['PO'].fillna('').replace('', 'General')
+    # Body and totals widths come from the same layout as the header row
+    date_w, desc_w, po_w, hours_w, amount_w = (width for width, _ in ACTIVITY_COLUMNS)
+    # Descriptions wrapped up front by multi_cell's own line breaking (a dry run draws nothing),
+    # so each row's height is known before any of its cells are drawn
+    multi_cell = pdf.multi_cell
+    desc_lines = [multi_cell(desc_w, 7, d, dry_run=True, output="LINES") for d in line_items['description'].tolist()]
+    # Columns converted to plain lists in one bulk pass each (iterating Arrow-backed Series
+    # boxes every element separately)
+    rows = zip(line_items['date_worked'].tolist(), desc_lines, po_names.tolist(), hours_text, amount_text)
+    # Bound methods hoisted out of the per-row loop
+    cell, rect, ln = pdf.cell, pdf.rect, pdf.ln
+    get_x, get_y, set_xy, add_page = pdf.get_x, pdf.get_y, pdf.set_xy, pdf.add_page
+    page_top = None  # Where rows start on a page this loop opened
+    for date_worked, lines, po_name, hours_str, amount_str in rows:
+        while lines:
+            # Lines that still fit above the bottom margin
+            room = int((pdf.page_break_trigger - get_y()) // 7)
+            if room < len(lines) and get_y() != page_top:
+                # Start a row that doesn't fit on the next page rather than letting it spill
+                add_page()
+                page_top = get_y()
+                continue
+            # A row taller than a whole page continues on the next one, other columns left blank
+            chunk, lines = lines[:room], lines[room:]
+            # Whole row grows with the description so wrapped lines never overlap the next row
+            row_height = 7 * len(chunk)
+            cell(date_w, row_height, date_worked, border=1)
+
+            # Handle long descriptions
+            x = get_x()
+            y = get_y()
+            rect(x, y, desc_w, row_height)
+            for i, line in enumerate(chunk):
+                set_xy(x, y + 7 * i)
+                cell(desc_w, 7, line)
+            set_xy(x + desc_w, y) # Reset position to right of description
+
+            cell(po_w, row_height, po_name, border=1)
+            cell(hours_w, row_height, hours_str, border=1, align='R')
+            cell(amount_w, row_height, amount_str, border=1, align='R')
+            ln()
+            date_worked = po_name = hours_str = amount_str = ''
         
     # Footer Total
-    pdf.set_font('Arial', 'B', 9)
-    pdf.cell(130, 8, "TOTALS FOR THIS PERIOD:", border=0, align='R')
-    pdf.cell(25, 8, f"{current_hours:.2f} Hours", border=1, align='R')
-    pdf.cell(30, 8, f"${invoice_total_amount:,.2f}", border=1, align='R')
+    pdf.set_font('Helvetica', 'B', 9)
+    pdf.cell(date_w + desc_w + po_w, 8, "TOTALS FOR THIS PERIOD:", border=0, align='R')
+    pdf.cell(hours_w, 8, f"{current_hours:.2f} Hours", border=1, align='R')
+    pdf.cell(amount_w, 8, _money(invoice_total_amount), border=1, align='R')
 
-    return pdf.output(dest='S').encode('latin-1')
\ No newline at end of file
+    # fpdf2 already returns the finished document as a bytearray; bytes() is the one copy
+    # st.download_button needs (it rejects bytearray)
+    return bytes(pdf.output())
\ No newline at end of file
@@ -0,0 +1,18 @@
+-- Per-project hour totals for the dashboard, aggregated server-side so the
+-- app no longer downloads every time_entries row.
+create or replace function get_project_usage()
+returns table (
+    project_id time_entries.project_id%type,
+    total_hours double precision,
+    unbilled_hours double precision
+)
+language sql
+stable
+as $$
+    select
+        project_id,
+        coalesce(sum(hours), 0)::double precision as total_hours,
+        coalesce(sum(hours) filter (where not billed), 0)::double precision as unbilled_hours
+    from time_entries
+    group by project_id
+$$;
@@ -0,0 +1,10 @@
+-- Hours already billed on a project, used for "prior billed days" on invoices.
+create or replace function project_billed_hours(pid time_entries.project_id%type)
+returns double precision
+language sql
+stable
+as $$
+    select coalesce(sum(hours), 0)::double precision
+    from time_entries
+    where project_id = pid and billed
+$$;
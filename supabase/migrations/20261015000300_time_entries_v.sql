@@ -0,0 +1,15 @@
+-- time_entries with the PO number joined in as a flat column, so callers
+-- don't have to unpack a nested purchase_orders object per row.
+create or replace view time_entries_v
+with (security_invoker = on)
+as
+select
+    t.id,
+    t.project_id,
+    t.date_worked,
+    t.description,
+    t.hours,
+    t.billed,
+    po.po_number
+from time_entries t
+left join purchase_orders po on po.id = t.po_id;
@@ -0,0 +1,20 @@
+-- The dashboard only shows active projects; stop returning usage rows the
+-- app would discard in its left merge.
+create or replace function get_project_usage()
+returns table (
+    project_id time_entries.project_id%type,
+    total_hours double precision,
+    unbilled_hours double precision
+)
+language sql
+stable
+as $$
+    select
+        t.project_id,
+        coalesce(sum(t.hours), 0)::double precision as total_hours,
+        coalesce(sum(t.hours) filter (where not t.billed), 0)::double precision as unbilled_hours
+    from time_entries t
+    join projects p on p.id = t.project_id
+    where p.active
+    group by t.project_id
+$$;
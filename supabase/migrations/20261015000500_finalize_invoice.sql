@@ -0,0 +1,31 @@
+-- Marks the previewed entries of a project as billed in a single statement.
+-- Only the ids the app showed are billed, so entries logged after the preview
+-- was loaded stay unbilled. If any id is already billed or belongs to another
+-- project the whole update is rolled back.
+-- Returns the number of entries billed.
+create or replace function finalize_invoice(
+    p_project_id time_entries.project_id%type,
+    p_invoice_ref time_entries.invoice_ref%type,
+    p_entry_ids bigint[]
+)
+returns integer
+language plpgsql
+volatile
+as $$
+declare
+    v_billed integer;
+begin
+    update time_entries
+    set billed = true, invoice_ref = p_invoice_ref
+    where project_id = p_project_id
+      and not billed
+      and id = any(p_entry_ids);
+    get diagnostics v_billed = row_count;
+
+    if v_billed <> cardinality(p_entry_ids) then
+        raise exception 'finalize_invoice: % of % previewed entries are still unbilled', v_billed, cardinality(p_entry_ids);
+    end if;
+
+    return v_billed;
+end;
+$$;
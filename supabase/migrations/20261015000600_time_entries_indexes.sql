@@ -0,0 +1,9 @@
+-- Invoice preview/count: unbilled entries for one project over a date range.
+-- Partial on "not billed" so the index only covers work still to invoice.
+create index if not exists time_entries_unbilled_project_date_idx
+    on time_entries (project_id, date_worked)
+    where not billed;
+
+-- Log Time daily snapshot filters on a single date.
+create index if not exists time_entries_date_worked_idx
+    on time_entries (date_worked);
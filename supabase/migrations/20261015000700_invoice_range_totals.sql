@@ -0,0 +1,20 @@
+-- Entry count and hour total for a project's unbilled entries in a date range,
+-- so the invoice tab reports true totals even when its preview is capped.
+create or replace function invoice_range_totals(
+    p_project_id time_entries.project_id%type,
+    p_start_date date,
+    p_end_date date
+)
+returns table (
+    entry_count integer,
+    total_hours double precision
+)
+language sql
+stable
+as $$
+    select count(*)::integer, coalesce(sum(hours), 0)::double precision
+    from time_entries
+    where project_id = p_project_id
+      and not billed
+      and date_worked between p_start_date and p_end_date
+$$;
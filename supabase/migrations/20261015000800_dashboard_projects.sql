@@ -0,0 +1,37 @@
+-- Everything the dashboard renders in one call: active projects with their
+-- client name and billed/unbilled hour totals, so the app makes one request
+-- and does no client-side join. Projects without a client are listed under
+-- "Unknown".
+create or replace function dashboard_projects()
+returns table (
+    id projects.id%type,
+    name projects.name%type,
+    client_name clients.name%type,
+    loa_budget_days projects.loa_budget_days%type,
+    daily_rate projects.daily_rate%type,
+    total_hours double precision,
+    unbilled_hours double precision
+)
+language sql
+stable
+as $$
+    select
+        p.id,
+        p.name,
+        coalesce(c.name, 'Unknown'),
+        p.loa_budget_days,
+        p.daily_rate,
+        coalesce(u.total_hours, 0),
+        coalesce(u.unbilled_hours, 0)
+    from projects p
+    left join clients c on c.id = p.client_id
+    left join (
+        select
+            project_id,
+            sum(hours)::double precision as total_hours,
+            sum(hours) filter (where not billed)::double precision as unbilled_hours
+        from time_entries
+        group by project_id
+    ) u on u.project_id = p.id
+    where p.active
+$$;
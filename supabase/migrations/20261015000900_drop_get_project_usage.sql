@@ -0,0 +1,2 @@
+-- dashboard_projects() replaced get_project_usage(); nothing calls it anymore.
+drop function if exists get_project_usage();
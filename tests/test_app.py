@@ -0,0 +1,133 @@
+import os
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+import streamlit as st
+import supabase
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(__file__), "..", "app.py")
+
+PROJECTS = [
+    {"id": 1, "name": "Alpha", "active": True, "loa_start": "2026-01-01", "loa_end": "2026-12-31",
+     "loa_budget_days": 20.0, "daily_rate": 1000.0, "clients": {"name": "Acme"}},
+    # No budget and no client yet
+    {"id": 2, "name": "Beta", "active": True, "loa_start": "2026-01-01", "loa_end": "2026-12-31",
+     "loa_budget_days": None, "daily_rate": None, "clients": None},
+]
+DASHBOARD = [
+    {"id": 1, "name": "Alpha", "client_name": "Acme", "loa_budget_days": 20.0, "daily_rate": 1000.0,
+     "total_hours": 16.0, "unbilled_hours": 8.0},
+    {"id": 2, "name": "Beta", "client_name": "Unknown", "loa_budget_days": None, "daily_rate": None,
+     "total_hours": 0.0, "unbilled_hours": 0.0},
+]
+PREVIEW = [
+    {"id": 11, "date_worked": "2026-10-01", "description": "Kick-off", "hours": 2.0, "po_number": None},
+    {"id": 12, "date_worked": "2026-10-02", "description": "Workshop", "hours": 6.0, "po_number": "PO-7"},
+]
+
+
+class FakeQuery:
+    """Chained PostgREST builder: filters are accepted and ignored, execute() returns canned rows."""
+
+    def __init__(self, result):
+        self.result = result
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        data = self.result() if callable(self.result) else self.result
+        return SimpleNamespace(data=data, count=None)
+
+
+class FakeSupabase:
+    def __init__(self, tables, rpcs):
+        self.tables = tables
+        self.rpcs = rpcs
+        self.rpc_calls = []
+
+    def table(self, name):
+        return FakeQuery(self.tables.get(name, []))
+
+    def rpc(self, name, params=None):
+        self.rpc_calls.append((name, params))
+        result = self.rpcs.get(name, [])
+        return FakeQuery((lambda: result(params)) if callable(result) else result)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    db = FakeSupabase(
+        tables={"projects": PROJECTS, "time_entries_v": PREVIEW, "clients": [{"id": 1, "name": "Acme"}]},
+        rpcs={
+            "dashboard_projects": DASHBOARD,
+            "invoice_range_totals": [{"entry_count": len(PREVIEW), "total_hours": 8.0}],
+            "project_billed_hours": 0,
+            "finalize_invoice": lambda params: len(params["p_entry_ids"]),
+        },
+    )
+    monkeypatch.setattr(supabase, "create_client", lambda *args, **kwargs: db)
+    # Cached reads outlive a single AppTest run
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    yield db
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_tab(tab):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.secrets["supabase"] = {"url": "https://example.supabase.co", "key": "test-key"}
+    at.session_state["main_tabs"] = tab
+    return at.run()
+
+
+def test_dashboard_renders_project_without_budget_or_client(fake_db):
+    at = run_tab("🚀 Dashboard")
+    assert not at.exception
+    assert [s.value for s in at.subheader] == ["Acme | Alpha", "Unknown | Beta"]
+    assert "Budget is 0 days." in [w.value for w in at.warning]
+
+
+def test_project_dropdowns_list_projects_without_a_client(fake_db):
+    at = run_tab("📝 Log Time")
+    assert not at.exception
+    assert at.selectbox[0].options == ["Acme | Alpha", "Unknown | Beta"]
+
+
+def test_manage_tab_lists_projects_without_a_client(fake_db):
+    at = run_tab("🛠️ Manage")
+    assert not at.exception
+    assert any("Unknown | Beta" in option for box in at.selectbox for option in box.options)
+
+
+def labelled(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def finalize():
+    at = run_tab("📄 Invoices")
+    labelled(at.date_input, "Select Date Range").set_value((date(2026, 10, 1), date(2026, 10, 31))).run()
+    labelled(at.text_input, "QuickBooks Invoice #").input("1099").run()
+    return labelled(at.button, "Finalize & Mark as Billed").click().run()
+
+
+def test_finalize_bills_exactly_the_previewed_entries(fake_db):
+    at = finalize()
+    assert not at.exception
+    calls = [params for name, params in fake_db.rpc_calls if name == "finalize_invoice"]
+    assert calls == [{"p_project_id": 1, "p_invoice_ref": "1099", "p_entry_ids": [11, 12]}]
+    assert any("finalized" in s.value for s in at.success)
+
+
+def test_finalize_reports_a_rejected_update(fake_db):
+    def mismatch(params):
+        raise RuntimeError("finalize_invoice: 1 of 2 previewed entries are still unbilled")
+
+    fake_db.rpcs["finalize_invoice"] = mismatch
+    at = finalize()
+    assert not at.exception
+    assert any("1 of 2 previewed entries" in e.value for e in at.error)
+    assert not any("finalized" in s.value for s in at.success)
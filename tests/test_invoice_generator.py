@@ -0,0 +1,136 @@
+import logging
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+import pytest
+from fpdf import FPDF
+from fpdf.errors import FPDFUnicodeEncodingException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import invoice_generator  # noqa: E402
+
+DESC_W = invoice_generator.ACTIVITY_COLUMNS[1][0]
+
+INVOICE = dict(
+    project_name="Alpha", invoice_num="1099",
+    start_date=date(2026, 10, 1), end_date=date(2026, 10, 31),
+    loa_start="2026-01-01", loa_end="2026-12-31",
+    loa_budget=100.0, daily_rate=1200.0, current_hours=3.0, prior_billed_days=2.0,
+)
+
+
+def line_items(*descriptions):
+    return [
+        {"date_worked": f"2026-10-{i + 1:02d}", "description": d, "PO": None if i % 2 else f"PO-{i}", "hours": 1.0}
+        for i, d in enumerate(descriptions)
+    ]
+
+
+class RecordingPDF(invoice_generator.PDF):
+    """Records every cell as (page, y, w, h, text)."""
+
+    def __init__(self, *args, **kwargs):
+        self.cells = []
+        super().__init__(*args, **kwargs)
+
+    def cell(self, w=None, h=None, text="", *args, **kwargs):
+        self.cells.append((self.page, self.y, w, h, text))
+        return super().cell(w, h, text, *args, **kwargs)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """Render through RecordingPDF; returns the list of rendered documents."""
+    docs = []
+
+    def make(*args, **kwargs):
+        pdf = RecordingPDF(*args, **kwargs)
+        docs.append(pdf)
+        return pdf
+
+    monkeypatch.setattr(invoice_generator, "PDF", make)
+    return docs
+
+
+def description_cells(pdf):
+    return [text for _, _, w, h, text in pdf.cells if w == DESC_W and h == 7]
+
+
+def logo_image_objects():
+    """Image objects a document gets from drawing the logo once (an alpha mask adds one)."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.image(invoice_generator._LOGO_BYTES, w=50)
+    return bytes(pdf.output()).count(b"/Subtype /Image")
+
+
+def multi_cell_lines(text):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", "", 8)
+    return pdf.multi_cell(DESC_W, 7, text, dry_run=True, output="LINES")
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Short note",
+    "Strategy workshop prep and follow-up notes for the steering committee " * 3,
+    "Line one\r\nLine two\n\nLine four\n",
+    "x" * 200,
+    "word " + "y" * 150 + "  trailing   ",
+])
+def test_description_lines_match_multi_cell(recorded, text):
+    invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items(text))
+    assert description_cells(recorded[0]) == multi_cell_lines(text)
+
+
+def test_list_of_dicts_renders_like_dataframe(recorded):
+    items = line_items("First entry", "Second entry " * 20, "Third")
+    invoice_generator.generate_invoice_pdf(**INVOICE, line_items=items)
+    invoice_generator.generate_invoice_pdf(**INVOICE, line_items=pd.DataFrame(items))
+    as_list, as_frame = recorded
+    assert as_list.cells == as_frame.cells
+    assert "General" in [text for *_, text in as_list.cells]
+
+
+def test_unsupported_character_raises_encoding_error():
+    with pytest.raises(FPDFUnicodeEncodingException):
+        invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items("Client’s sign-off ✓"))
+
+
+def test_row_taller_than_a_page_continues_on_the_next(recorded):
+    text = "word " * 3000
+    out = invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items(text, "After"))
+    pdf = recorded[0]
+    assert out.startswith(b"%PDF")
+    assert pdf.pages_count > 2
+    assert description_cells(pdf) == multi_cell_lines(text) + ["After"]
+    # Nothing is drawn into the bottom margin
+    assert all(y + h <= pdf.page_break_trigger + 1e-6 for _, y, _, h, _ in pdf.cells if h == 7)
+
+
+@pytest.mark.skipif(invoice_generator._LOGO_BYTES is None, reason="logo.png missing")
+def test_every_invoice_embeds_the_logo(monkeypatch):
+    monkeypatch.setattr(invoice_generator, "_logo_cache", None)
+    first = invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items("One"))
+    assert invoice_generator._logo_cache is not None
+    second = invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items("Two"))
+    for out in (first, second):
+        assert out.count(b"/Subtype /Image") == logo_image_objects()
+
+
+@pytest.mark.skipif(invoice_generator._LOGO_BYTES is None, reason="logo.png missing")
+def test_logo_sharing_failure_falls_back_and_logs(monkeypatch, caplog):
+    def broken(*args):
+        raise KeyError("image info")
+
+    monkeypatch.setattr(invoice_generator, "_logo_cache", None)
+    monkeypatch.setattr(invoice_generator, "_logo_sharing", True)
+    monkeypatch.setattr(invoice_generator, "preload_image", broken)
+    with caplog.at_level(logging.WARNING, logger=invoice_generator.__name__):
+        out = invoice_generator.generate_invoice_pdf(**INVOICE, line_items=line_items("One"))
+    assert out.count(b"/Subtype /Image") == logo_image_objects()
+    assert invoice_generator._logo_sharing is False
+    assert "parsing it per invoice" in caplog.text